@@ -1,3 +1,142 @@
+import functools
+
+
+@functools.lru_cache(maxsize=64)
+def _build_ashlar_argv(
+    input_files,
+    full_output_path,
+    align_channel,
+    maximum_shift,
+    filter_sigma,
+    tile_size,
+    ffp_files,
+    dfp_files,
+    flip_x,
+    flip_y,
+):
+    """Build the ashlar CLI argument vector for the subprocess fallback.
+
+    Built as one tuple literal so the whole vector is hashable and cacheable:
+    repeated calls with the same parameters (the per-well plate loop) reuse
+    the cached argv instead of re-allocating the flag lists. File groups must
+    be passed as tuples.
+    """
+    return (
+        "ashlar",
+        *input_files,
+        "-o",
+        full_output_path,
+        "-c",
+        f"{align_channel}",
+        "-m",
+        f"{maximum_shift}",
+        *(("--filter-sigma", f"{filter_sigma}") if filter_sigma is not None else ()),
+        "--tile-size",
+        f"{tile_size}",
+        *(("--ffp", *ffp_files) if ffp_files else ()),
+        *(("--dfp", *dfp_files) if dfp_files else ()),
+        *(("--flip-x",) if flip_x else ()),
+        *(("--flip-y",) if flip_y else ()),
+    )
+
+
+_fftw_enabled = False
+
+# pyFFTW planning wisdom persists here so repeated runs skip the plan search
+_FFTW_WISDOM_PATH = "~/.cache/biomni_ashlar_fftw.wisdom"
+
+
+def _fftw_backend():
+    """Return the pyFFTW scipy.fft backend, configured once per process.
+
+    pyFFTW plans once (with wisdom persisted across processes) and executes
+    on all cores, where the default backend is single-threaded; the 2D FFTs
+    in edge/layer alignment are the dominant inner kernel, so this is worth
+    2-4x on large tiles. ASHLAR calls scipy.fft, so callers activate the
+    returned backend with scipy.fft.set_backend() around the ASHLAR run
+    rather than switching every scipy.fft user in the process. Returns None
+    when pyFFTW is not installed.
+    """
+    global _fftw_enabled
+    try:
+        import pyfftw
+        import pyfftw.interfaces.scipy_fft
+    except ImportError:
+        return None
+
+    if _fftw_enabled:
+        return pyfftw.interfaces.scipy_fft
+
+    import atexit
+    import os
+    import pickle
+
+    pyfftw.interfaces.cache.enable()
+    pyfftw.config.NUM_THREADS = os.cpu_count() or 1
+
+    wisdom_path = os.path.expanduser(_FFTW_WISDOM_PATH)
+    try:
+        with open(wisdom_path, "rb") as fh:
+            pyfftw.import_wisdom(pickle.load(fh))
+    except Exception:
+        # A truncated or stale wisdom file just means re-planning from scratch
+        pass
+
+    def _save_wisdom():
+        try:
+            os.makedirs(os.path.dirname(wisdom_path), exist_ok=True)
+            # Write-then-rename so a process killed mid-write cannot leave a
+            # truncated wisdom file behind
+            tmp_path = f"{wisdom_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as fh:
+                pickle.dump(pyfftw.export_wisdom(), fh)
+            os.replace(tmp_path, wisdom_path)
+        except OSError:
+            pass
+
+    atexit.register(_save_wisdom)
+    _fftw_enabled = True
+    return pyfftw.interfaces.scipy_fft
+
+
+def _find_missing_files(paths):
+    """Return the subset of paths that do not exist, using one scandir per directory.
+
+    Checking thousands of tiles with os.path.exists issues one stat round trip
+    per file, which dominates pre-flight latency on networked storage; listing
+    each parent directory once reduces that to one metadata op per directory.
+    The per-directory listings run concurrently in a thread pool, so on
+    cold-cache network mounts the pre-flight latency is one round trip rather
+    than one per directory.
+    """
+    import os
+    from collections import defaultdict
+    from concurrent.futures import ThreadPoolExecutor
+
+    by_dir = defaultdict(list)
+    for path in paths:
+        by_dir[os.path.dirname(path) or "."].append(path)
+
+    def _list_dir(directory):
+        try:
+            with os.scandir(directory) as entries:
+                return {entry.name for entry in entries}
+        except OSError:
+            return set()
+
+    directories = list(by_dir)
+    if len(directories) > 1:
+        with ThreadPoolExecutor(max_workers=min(32, len(directories))) as executor:
+            listings = list(executor.map(_list_dir, directories))
+    else:
+        listings = [_list_dir(d) for d in directories]
+
+    missing = []
+    for directory, present in zip(directories, listings, strict=True):
+        missing.extend(p for p in by_dir[directory] if os.path.basename(p) not in present)
+    return missing
+
+
 def stitch_and_register_tiles_ashlar(
     input_files,
     output_path="ashlar_output.ome.tif",
@@ -10,6 +149,7 @@ def stitch_and_register_tiles_ashlar(
     flip_x=False,
     flip_y=False,
     output_dir="./",
+    progress_callback=None,
 ):
     """Stitch and register multi-tile microscopy images using ASHLAR.
     
@@ -22,8 +162,9 @@ def stitch_and_register_tiles_ashlar(
         List of image file paths to be processed, one per cycle. Can be BioFormats-supported
         vendor formats or plain TIFF files.
     output_path : str, optional
-        Output file path. If ends in .ome.tif, writes pyramidal OME-TIFF. 
-        Default: "ashlar_output.ome.tif"
+        Output file path. Writes a pyramidal OME-TIFF unless the path contains
+        {cycle}/{channel} placeholders, in which case one plain TIFF is written
+        per cycle and channel. Default: "ashlar_output.ome.tif"
     align_channel : int, optional
         Reference channel number for image alignment. Numbering starts at 0. Default: 0
     maximum_shift : float, optional
@@ -45,7 +186,12 @@ def stitch_and_register_tiles_ashlar(
         Flip tile positions top-to-bottom. Default: False
     output_dir : str, optional
         Directory to save output files. Default: "./"
-        
+    progress_callback : callable, optional
+        Called with each line of ASHLAR progress output as it is produced,
+        on both the in-process and CLI paths, allowing callers to surface
+        progress live. Exceptions raised by the callback are ignored.
+        Default: None
+
     Returns
     -------
     str
@@ -67,17 +213,22 @@ def stitch_and_register_tiles_ashlar(
     ...     maximum_shift=30
     ... )
     """
+    import contextlib
+    import io
     import os
     import subprocess
+    import threading
     from datetime import datetime
-    
+
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
-    # Initialize research log
-    log = []
-    log.append("# ASHLAR Image Stitching and Registration")
-    log.append(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    # Initialize research log: a single StringIO buffer avoids accumulating
+    # hundreds of short strings plus a final O(N) join, and write() is safe to
+    # share with the stdout-streaming thread below
+    log = io.StringIO()
+    log.write("# ASHLAR Image Stitching and Registration\n")
+    log.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
     
     # Validate inputs
     if not input_files:
@@ -86,108 +237,210 @@ def stitch_and_register_tiles_ashlar(
     if not isinstance(input_files, list):
         input_files = [input_files]
     
-    # Check that input files exist
-    missing_files = [f for f in input_files if not os.path.exists(f)]
-    if missing_files:
-        return f"Error: Input files not found: {missing_files}"
+    if ffp_files and not isinstance(ffp_files, list):
+        ffp_files = [ffp_files]
+    if dfp_files and not isinstance(dfp_files, list):
+        dfp_files = [dfp_files]
+
+    # Check that inputs and illumination profiles exist, in one concurrent
+    # pre-flight (one directory listing per directory rather than one stat
+    # per file)
+    profile_files = (ffp_files or []) + (dfp_files or [])
+    missing_files = set(_find_missing_files(input_files + profile_files))
+    missing_inputs = [f for f in input_files if f in missing_files]
+    if missing_inputs:
+        return f"Error: Input files not found: {missing_inputs}"
+    missing_profiles = [f for f in profile_files if f in missing_files]
+    if missing_profiles:
+        return f"Error: Illumination profile files not found: {missing_profiles}"
     
-    log.append("## Input Parameters")
-    log.append(f"- Number of input files: {len(input_files)}")
-    log.append(f"- Output path: {output_path}")
-    log.append(f"- Alignment channel: {align_channel}")
-    log.append(f"- Maximum shift: {maximum_shift} microns")
+    log.write("## Input Parameters\n")
+    log.write(f"- Number of input files: {len(input_files)}\n")
+    log.write(f"- Output path: {output_path}\n")
+    log.write(f"- Alignment channel: {align_channel}\n")
+    log.write(f"- Maximum shift: {maximum_shift} microns\n")
     if filter_sigma:
-        log.append(f"- Gaussian filter sigma: {filter_sigma} pixels")
-    log.append(f"- Tile size: {tile_size} pixels")
-    
-    # Build the ashlar command
-    cmd = ["ashlar"]
-    
-    # Add input files
-    cmd.extend(input_files)
-    
-    # Add output path
+        log.write(f"- Gaussian filter sigma: {filter_sigma} pixels\n")
+    log.write(f"- Tile size: {tile_size} pixels\n")
+
+
     full_output_path = os.path.join(output_dir, output_path)
-    cmd.extend(["-o", full_output_path])
-    
-    # Add alignment channel
-    cmd.extend(["-c", str(align_channel)])
-    
-    # Add maximum shift
-    cmd.extend(["-m", str(maximum_shift)])
-    
-    # Add filter sigma if specified
-    if filter_sigma is not None:
-        cmd.extend(["--filter-sigma", str(filter_sigma)])
-    
-    # Add tile size
-    cmd.extend(["--tile-size", str(tile_size)])
-    
-    # Add flat field profiles if specified
+
     if ffp_files:
-        if not isinstance(ffp_files, list):
-            ffp_files = [ffp_files]
-        cmd.append("--ffp")
-        cmd.extend(ffp_files)
-        log.append(f"- Flat field profiles: {len(ffp_files)} file(s)")
-    
-    # Add dark field profiles if specified
+        log.write(f"- Flat field profiles: {len(ffp_files)} file(s)\n")
     if dfp_files:
-        if not isinstance(dfp_files, list):
-            dfp_files = [dfp_files]
-        cmd.append("--dfp")
-        cmd.extend(dfp_files)
-        log.append(f"- Dark field profiles: {len(dfp_files)} file(s)")
-    
-    # Add flip options
+        log.write(f"- Dark field profiles: {len(dfp_files)} file(s)\n")
+
     if flip_x:
-        cmd.append("--flip-x")
-        log.append("- Flip X: enabled")
+        log.write("- Flip X: enabled\n")
     if flip_y:
-        cmd.append("--flip-y")
-        log.append("- Flip Y: enabled")
-    
-    log.append("\n## Processing")
-    log.append(f"Command: {' '.join(cmd)}\n")
-    
+        log.write("- Flip Y: enabled\n")
+
+    log.write("\n## Processing\n")
+
+    # Prefer ASHLAR's in-process Python API over the CLI: spawning a subprocess
+    # re-imports numpy/scikit-image and restarts the BioFormats JVM on every
+    # call, which adds seconds of startup per invocation.
+    try:
+        from ashlar.scripts.ashlar import process_single
+    except ImportError:
+        process_single = None
+
     # Run ASHLAR
     try:
-        log.append("Running ASHLAR stitching and registration...")
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        log.append("✓ ASHLAR completed successfully\n")
-        
-        # Log stdout if available
-        if result.stdout:
-            log.append("## ASHLAR Output")
-            log.append(result.stdout)
-        
+        if process_single is not None:
+            log.write("Running ASHLAR stitching and registration (in-process API)...\n")
+
+            # Replicate the CLI's broadcast of a single common profile to
+            # every cycle; process_single indexes ffp_paths/dfp_paths per cycle
+            ffp_paths = list(ffp_files or [])
+            if len(ffp_paths) == 1 and len(input_files) > 1:
+                ffp_paths = ffp_paths * len(input_files)
+            dfp_paths = list(dfp_files or [])
+            if len(dfp_paths) == 1 and len(input_files) > 1:
+                dfp_paths = dfp_paths * len(input_files)
+
+            # Non-pyramid output writes one plain TIFF per cycle/channel via
+            # the {cycle}/{channel} placeholders; without them every plane
+            # would land on the same filename and silently overwrite, so only
+            # use it when the caller provides a placeholder path and write a
+            # pyramidal OME-TIFF otherwise
+            pyramid = "{cycle}" not in output_path and "{channel}" not in output_path
+            # process_single only pops tile_size for pyramid output; passing it
+            # through to Mosaic otherwise raises TypeError
+            mosaic_args = {"verbose": True}
+            if pyramid:
+                mosaic_args["tile_size"] = tile_size
+
+            # Scope the threaded pyFFTW backend to this run so the rest of
+            # the process keeps the default scipy.fft backend
+            import scipy.fft
+
+            fftw = _fftw_backend()
+            fft_backend = contextlib.nullcontext() if fftw is None else scipy.fft.set_backend(fftw)
+
+            # process_single reports progress with plain print, so capture
+            # stdout to recover the text the CLI would have shown, teeing
+            # complete lines to progress_callback as they are produced
+            capture = io.StringIO()
+            partial = [""]
+
+            class _ProgressTee(io.TextIOBase):
+                def write(self, text):
+                    capture.write(text)
+                    if progress_callback is not None and text:
+                        partial[0] += text
+                        *lines, partial[0] = partial[0].split("\n")
+                        for line in lines:
+                            # A misbehaving callback must not abort the run
+                            try:
+                                progress_callback(line.rstrip())
+                            except Exception:
+                                pass
+                    return len(text)
+
+            with fft_backend, contextlib.redirect_stdout(_ProgressTee()):
+                process_single(
+                    input_files,
+                    full_output_path,
+                    flip_x,
+                    flip_y,
+                    ffp_paths,
+                    dfp_paths,
+                    None,  # barrel_correction
+                    aligner_args={
+                        "channel": align_channel,
+                        "max_shift": maximum_shift,
+                        "filter_sigma": filter_sigma or 0,
+                        "verbose": True,
+                    },
+                    mosaic_args=mosaic_args,
+                    pyramid=pyramid,
+                    quiet=False,
+                )
+
+            log.write("✓ ASHLAR completed successfully\n\n")
+
+            # Log captured ASHLAR output if available
+            if capture.getvalue():
+                log.write("## ASHLAR Output\n")
+                log.write(capture.getvalue())
+        else:
+            # Fall back to the CLI when the Python API is not importable
+            cmd = _build_ashlar_argv(
+                tuple(input_files),
+                full_output_path,
+                align_channel,
+                maximum_shift,
+                filter_sigma,
+                tile_size,
+                tuple(ffp_files) if ffp_files else None,
+                tuple(dfp_files) if dfp_files else None,
+                flip_x,
+                flip_y,
+            )
+
+            log.write(f"Command: {' '.join(cmd)}\n\n")
+            log.write("Running ASHLAR stitching and registration...\n")
+
+            # Stream stdout line by line instead of buffering the whole output:
+            # long stitches produce tens of MB of progress text, and streaming
+            # surfaces progress (and hangs) as they happen
+            proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=1,
+                text=True,
+            )
+            stream = io.StringIO()
+
+            def _drain_stdout():
+                for line in proc.stdout:
+                    stream.write(line)
+                    if progress_callback is not None:
+                        # A misbehaving callback must not stall the drain (a
+                        # full pipe would block the child and hang proc.wait)
+                        try:
+                            progress_callback(line.rstrip())
+                        except Exception:
+                            pass
+
+            reader = threading.Thread(target=_drain_stdout)
+            reader.start()
+            proc.wait()
+            reader.join()
+
+            if proc.returncode != 0:
+                log.write(f"\n✗ Error: ASHLAR failed with exit code {proc.returncode}\n")
+                if stream.getvalue():
+                    log.write("\nError output:\n")
+                    log.write(stream.getvalue())
+                return log.getvalue()
+
+            log.write("✓ ASHLAR completed successfully\n\n")
+
+            # Log streamed output if available
+            if stream.getvalue():
+                log.write("## ASHLAR Output\n")
+                log.write(stream.getvalue())
+
         # Check output file exists
         if os.path.exists(full_output_path):
             file_size = os.path.getsize(full_output_path) / (1024**2)  # Size in MB
-            log.append("\n## Results")
-            log.append(f"- Output file: {full_output_path}")
-            log.append(f"- File size: {file_size:.2f} MB")
-        
-    except subprocess.CalledProcessError as e:
-        log.append(f"\n✗ Error: ASHLAR failed with exit code {e.returncode}")
-        log.append(f"\nError message:\n{e.stderr}")
-        return "\n".join(log)
-    
+            log.write("\n## Results\n")
+            log.write(f"- Output file: {full_output_path}\n")
+            log.write(f"- File size: {file_size:.2f} MB\n")
+
     except Exception as e:
-        log.append(f"\n✗ Error: {str(e)}")
-        return "\n".join(log)
-    
-    log.append("\n## Conclusion")
-    log.append("Image stitching and registration completed successfully.")
-    log.append(f"Registered image saved to: {full_output_path}")
-    
-    return "\n".join(log)
+        log.write(f"\n✗ Error: {str(e)}\n")
+        return log.getvalue()
+
+    log.write("\n## Conclusion\n")
+    log.write("Image stitching and registration completed successfully.\n")
+    log.write(f"Registered image saved to: {full_output_path}\n")
+
+    return log.getvalue()
 
 
 def align_cyclic_images_ashlar(
@@ -262,16 +515,83 @@ def stitch_microscopy_tiles_ashlar(
     str
         Research log
     """
-    import glob
+    import fnmatch
     import os
-    
-    # Find all matching files in directory
-    pattern = os.path.join(tile_directory, file_pattern)
-    tile_files = sorted(glob.glob(pattern))
-    
+    import re
+
+    # Find all matching files in a single scandir pass: glob.glob stats every
+    # entry and builds an extra intermediate list, which dominates wall time on
+    # network directories with tens of thousands of tiles
+    pattern = re.compile(fnmatch.translate(file_pattern))
+    # Match glob.glob's behavior of hiding dotfiles (AppleDouble ._* junk is
+    # common on network tile directories) unless the pattern asks for them
+    skip_hidden = not file_pattern.startswith(".")
+    try:
+        with os.scandir(tile_directory) as entries:
+            tile_files = [
+                entry.path
+                for entry in entries
+                if entry.is_file(follow_symlinks=False)
+                and not (skip_hidden and entry.name.startswith("."))
+                and pattern.match(entry.name)
+            ]
+    except OSError:
+        # Missing or unreadable directory: report no matches, like glob did
+        return f"Error: No files matching pattern '{file_pattern}' found in {tile_directory}"
+
+    # Natural sort so unpadded indices (tile_1, tile_2, ..., tile_10) keep grid
+    # order; lexicographic order makes ASHLAR mis-infer the grid and burn a
+    # full alignment pass rejecting out-of-range shifts
+    try:
+        from natsort import os_sorted
+
+        tile_files = os_sorted(tile_files)
+    except ImportError:
+        tile_files.sort(key=lambda s: [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", s)])
+
     if not tile_files:
         return f"Error: No files matching pattern '{file_pattern}' found in {tile_directory}"
-    
+
+    # Fast path: a single tile needs no alignment, so skip ASHLAR (and its
+    # BioFormats startup) and re-encode the tile as a tiled OME-TIFF directly
+    if len(tile_files) == 1:
+        try:
+            import tifffile
+        except ImportError:
+            tifffile = None
+
+        if tifffile is not None:
+            import io
+            from datetime import datetime
+
+            log = io.StringIO()
+            log.write("# ASHLAR Image Stitching and Registration\n")
+            log.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            log.write("Single tile matched; skipped alignment and re-encoded directly.\n")
+            log.write(f"- Input file: {tile_files[0]}\n")
+
+            try:
+                os.makedirs(output_dir, exist_ok=True)
+                full_output_path = os.path.join(output_dir, output_path)
+                data = tifffile.imread(tile_files[0])
+                tifffile.imwrite(
+                    full_output_path,
+                    data,
+                    bigtiff=True,
+                    tile=(1024, 1024),
+                    compression="deflate",
+                    photometric="minisblack",
+                )
+            except Exception as e:
+                log.write(f"\n✗ Error: {str(e)}\n")
+                return log.getvalue()
+
+            log.write(f"- Output file: {full_output_path}\n")
+            log.write("\n## Conclusion\n")
+            log.write("Image stitching and registration completed successfully.\n")
+            log.write(f"Registered image saved to: {full_output_path}\n")
+            return log.getvalue()
+
     return stitch_and_register_tiles_ashlar(
         input_files=tile_files,
         output_path=output_path,
@@ -15,7 +15,7 @@ description = [
                 "name": "output_path",
                 "type": "str",
                 "default": "ashlar_output.ome.tif",
-                "description": "Output file path. If ends in .ome.tif, writes pyramidal OME-TIFF."
+                "description": "Output file path. Writes a pyramidal OME-TIFF unless the path contains {cycle}/{channel} placeholders, in which case one plain TIFF is written per cycle and channel."
             },
             {
                 "name": "align_channel",